@@ -0,0 +1,45 @@
+from typing import Dict, Iterable, List
+
+
+class ArtistIndex:
+    """Interns sparse Discogs artist ids (strings) as dense integer node ids 0..N-1"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.artists: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.artists)
+
+    def intern(self, artist: str) -> int:
+        node = self.ids.get(artist)
+        if node is None:
+            node = len(self.artists)
+            self.ids[artist] = node
+            self.artists.append(artist)
+        return node
+
+    def intern_all(self, artists: Iterable[str]) -> List[int]:
+        return [self.intern(a) for a in artists]
+
+    def lookup(self, node: int) -> str:
+        return self.artists[node]
+
+    def lookup_all(self, nodes: Iterable[int]) -> List[str]:
+        return [self.artists[n] for n in nodes]
+
+    def save(self, out_path: str = "artist_index.tsv"):
+        with open(out_path, "w") as f:
+            f.writelines(["node\tartist_id\n"] + [f"{node}\t{artist}\n" for node, artist in enumerate(self.artists)])
+
+    @classmethod
+    def load(cls, in_path: str = "artist_index.tsv") -> "ArtistIndex":
+        index = cls()
+        with open(in_path) as f:
+            f.readline()
+            for x in f:
+                line = x.rstrip().split("\t")
+                if int(line[0]) != len(index.artists):
+                    raise ValueError(f"Artist index {in_path} is not dense at node {line[0]}")
+                index.intern(line[1])
+        return index
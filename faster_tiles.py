@@ -2,10 +2,18 @@
     Created on 11/feb/2015
     @author: Giulio Rossetti
 """
+from array import array
+from bisect import bisect_left
 import csv
 from datetime import datetime
 import gzip
 from networkx import Graph
+import sys
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 
 class TILES(object):
@@ -14,21 +22,24 @@ class TILES(object):
         Algorithm for evolutionary community discovery
     """
 
-    def __init__(self, filename=None, obs=7, path=""):
+    def __init__(self, filename=None, obs=7, path="", n_nodes=None):
         """
             Constructor
             :param filename: Path to the edges file (TSV)
             :param obs: observation window (days)
             :param path: Path specifying where to generate the results
+            :param n_nodes: Size of the artist index the edges were written with, if known (node ids must be below it)
         """
         self.filename = filename
         self.obs = obs
         self.path = path
+        self.n_nodes = n_nodes
         self.start = None
         self.g = Graph()
         self.cid = 0
         self.slice_no = 0
         self.communities = {}
+        self.node_coms = []  # community memberships, indexed by (dense) node id
         self.dt_map = {}
 
     @staticmethod
@@ -56,8 +67,29 @@ class TILES(object):
             Execute TILES algorithm
         """
         with open(self.filename, "r") as f:
-            self.start = f.readline().split("\t")[2].rstrip()
-            self.dt_map = {t.rstrip(): datetime.fromtimestamp(int(t)) for t in {x.split("\t")[2] for x in f}}
+            line = f.readline().split("\t")
+            self.start = line[2].rstrip()
+            timestamps = {self.start}
+            min_id = min(int(line[0]), int(line[1]))
+            max_id = max(int(line[0]), int(line[1]))
+            for x in f:
+                line = x.split("\t")
+                timestamps.add(line[2].rstrip())
+                u = int(line[0])
+                v = int(line[1])
+                if u < min_id or v < min_id:
+                    min_id = min(u, v)
+                if u > max_id or v > max_id:
+                    max_id = max(u, v)
+            self.dt_map = {t: datetime.fromtimestamp(int(t)) for t in timestamps}
+
+        # node ids are dense (see artist_index.py), so memberships can live in a plain list
+        if min_id < 0:
+            raise ValueError("Negative node id %d in %s" % (min_id, self.filename))
+        if self.n_nodes is not None and max_id >= self.n_nodes:
+            raise ValueError("Node id %d is outside the artist index (%d nodes): %s does not use dense node ids "
+                             "(re-run format_data.py to regenerate it)" % (max_id, self.n_nodes, self.filename))
+        self.node_coms = [self._empty_memberships() for _ in range(max_id + 1)]
 
         last_break = self.dt_map[self.start]
 
@@ -76,18 +108,12 @@ class TILES(object):
                 #############################################
                 if (dt - last_break).days >= self.obs:
                     last_break = dt
-                    print("New slice. Starting Day: %s" % dt)
+                    print("New slice. Starting Day: %s (peak memory: %.1f MB)" % (dt, self.peak_memory_mb()))
                     self.print_communities()
 
                 if u == v:
                     continue
 
-                if not self.g.has_node(u):
-                    self.g.add_node(u, c_coms=set())  # central
-
-                if not self.g.has_node(v):
-                    self.g.add_node(v, c_coms=set())
-
                 try:
                     self.g.adj[u][v]["weight"] += 1
                     continue
@@ -106,6 +132,40 @@ class TILES(object):
                     self.common_neighbors_analysis(u, v, list(set(u_n) & set(v_n)))
 
         self.print_communities()
+        print("Done. Peak memory: %.1f MB" % self.peak_memory_mb())
+
+    @staticmethod
+    def peak_memory_mb():
+        """
+            Peak resident set size of the whole process so far, so TILES and CompactTILES must be run in separate
+            processes to compare them (ru_maxrss is in bytes on macOS and KB elsewhere)
+            :return: peak memory in MB, or nan where the resource module is unavailable
+        """
+        if resource is None:
+            return float("nan")
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    @staticmethod
+    def _empty_members():
+        return set()
+
+    @staticmethod
+    def _empty_memberships():
+        return set()
+
+    @staticmethod
+    def _community_key(members):
+        """
+            Hashable key identifying a community by its members (used to merge duplicates)
+        """
+        com = [*members]
+        com.sort()
+        return tuple(com)
+
+    @staticmethod
+    def _key_to_list(key):
+        return list(key)
 
     @property
     def new_community_id(self):
@@ -114,7 +174,7 @@ class TILES(object):
             :return: new community id
         """
         self.cid += 1
-        self.communities[self.cid] = set()
+        self.communities[self.cid] = self._empty_members()
         return self.cid
 
     def common_neighbors_analysis(self, u, v, common_neighbors):
@@ -129,8 +189,8 @@ class TILES(object):
         if len(common_neighbors) < 1:
             return
         else:
-            v_node = self.g.nodes[v]["c_coms"]
-            u_node = self.g.nodes[u]["c_coms"]
+            v_node = self.node_coms[v]
+            u_node = self.node_coms[u]
             v_coms = {*v_node}
             u_coms = {*u_node}
             shared_coms = v_coms & u_coms
@@ -142,7 +202,7 @@ class TILES(object):
             propagated = False
 
             for z in common_neighbors:
-                z_node = self.g.nodes[z]["c_coms"]
+                z_node = self.node_coms[z]
                 common_neighbors_coms.append((z, z_node))
 
                 if only_u or only_v:
@@ -154,8 +214,8 @@ class TILES(object):
                             self.add_to_community(v, v_node, c)
                             propagated = True
 
-                for c in shared_coms:
-                    if c not in z_node:
+                if shared_coms:
+                    for c in shared_coms.difference(z_node):
                         self.add_to_community(z, z_node, c)
                         propagated = True
 
@@ -181,9 +241,7 @@ class TILES(object):
         for idc, comk in self.communities.items():
             if self.communities[idc] is not None:
                 if len(comk) > 2:
-                    com = [*comk]
-                    com.sort()
-                    key = tuple(com)
+                    key = self._community_key(comk)
 
                     # Collision check and merge index build (maintaining the lowest id)
                     if key not in nodes_to_coms:
@@ -205,7 +263,7 @@ class TILES(object):
                 drop_c.append(idc)
 
         for _, batch in self.batched(list(nodes_to_coms.items())):
-            out_file_coms.writelines([u"%d\t%s\n" % (b[1], str(list(b[0]))) for b in batch])
+            out_file_coms.writelines([u"%d\t%s\n" % (b[1], str(self._key_to_list(b[0]))) for b in batch])
 
         out_file_coms.close()
 
@@ -226,7 +284,7 @@ class TILES(object):
     def destroy_community(self, cid):
         nodes = [*self.communities[cid]]  # slightly faster than doing list(dict.keys())
         for n in nodes:
-            n_node = self.g.nodes[n]["c_coms"]
+            n_node = self.node_coms[n]
             self.remove_from_community(n, n_node, cid)
         del self.communities[cid]  # n.b. "cid in self.communities" checked pre-call
 
@@ -242,3 +300,60 @@ class TILES(object):
             node.remove(cid)
             if node_name in self.communities[cid]:
                 self.communities[cid].remove(node_name)
+
+
+class CompactTILES(TILES):
+    """
+        Memory-bounded TILES
+        Community members and per-node memberships are kept as sorted int arrays (searched with bisect),
+        rather than Python sets of boxed ints. Output is identical to TILES.
+    """
+
+    @staticmethod
+    def _empty_members():
+        return array("i")
+
+    @staticmethod
+    def _empty_memberships():
+        return array("i")
+
+    @staticmethod
+    def _community_key(members):
+        # members are already sorted, so the raw buffer identifies the community without a tuple copy
+        return members.tobytes()
+
+    @staticmethod
+    def _key_to_list(key):
+        members = array("i")
+        members.frombytes(key)
+        return members.tolist()
+
+    @staticmethod
+    def _sorted_insert(values, x):
+        idx = bisect_left(values, x)
+        if idx == len(values) or values[idx] != x:
+            values.insert(idx, x)
+
+    @staticmethod
+    def _sorted_remove(values, x):
+        idx = bisect_left(values, x)
+        if idx < len(values) and values[idx] == x:
+            del values[idx]
+            return True
+        return False
+
+    def destroy_community(self, cid):
+        for n in self.communities[cid]:
+            self._sorted_remove(self.node_coms[n], cid)
+        del self.communities[cid]  # n.b. "cid in self.communities" checked pre-call
+
+    def add_to_community(self, node_name, node, cid):
+        self._sorted_insert(node, cid)
+        if cid in self.communities:
+            self._sorted_insert(self.communities[cid], node_name)
+        else:
+            self.communities[cid] = array("i", (node_name, ))
+
+    def remove_from_community(self, node_name, node, cid):
+        if self._sorted_remove(node, cid):
+            self._sorted_remove(self.communities[cid], node_name)
@@ -1,3 +1,4 @@
+from artist_index import ArtistIndex
 from datetime import datetime
 from itertools import combinations
 import numpy as np
@@ -35,9 +36,11 @@ def remove_duplicates(data: pd.DataFrame) -> pd.DataFrame:
     return sorted_data[(sorted_data["master_id"].isna()) | (~sorted_data["master_id"].duplicated(keep="first"))]
 
 
-def write_edge_list(data: pd.DataFrame, out_path: str = None) -> None:
-    data = data[data["timestamp"] > -1]
-    out = []
+def write_edge_list(data: pd.DataFrame, out_path: str = None, index_path: str = "artist_index.tsv") -> ArtistIndex:
+    # Artist ids are interned as dense node ids (in order of first appearance), with the mapping saved to index_path
+    data = data[data["timestamp"] > -1].sort_values(by="timestamp", kind="mergesort")
+    index = ArtistIndex()
+    artist_1, artist_2, timestamps = [], [], []
 
     for timestamp, artists in zip(data["timestamp"].values, data["artists"].values):
         if not isinstance(artists, str) and np.isnan(artists):
@@ -45,13 +48,18 @@ def write_edge_list(data: pd.DataFrame, out_path: str = None) -> None:
 
         artists_list = artists.split(", ")
         if len(artists_list) > 1:
-            for collab in combinations(artists_list, 2):
-                out.append({"artist_1": collab[0], "artist_2": collab[1], "timestamp": timestamp})
+            for collab in combinations(index.intern_all(artists_list), 2):
+                artist_1.append(collab[0])
+                artist_2.append(collab[1])
+                timestamps.append(timestamp)
 
-    pd.DataFrame(out).sort_values(by="timestamp").to_csv(out_path, sep="\t", index=False, header=False)
+    pd.DataFrame({"artist_1": artist_1, "artist_2": artist_2, "timestamp": timestamps}).to_csv(out_path, sep="\t", index=False, header=False)
+    index.save(index_path)
+
+    return index
 
 
 if __name__ == "__main__":
     df = pd.read_csv("releases_raw.tsv", sep="\t")
     clean_df = clean_data(df, "releases.tsv")
-    write_edge_list(clean_df, "edges.tsv")
+    write_edge_list(clean_df, "edges.tsv", "artist_index.tsv")
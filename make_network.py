@@ -1,13 +1,17 @@
+from array import array
+from artist_index import ArtistIndex
 from datetime import datetime
 from itertools import chain
 import json
 from os import path
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 
 
 class Network:
-    def __init__(self, edges_file: str, min_group_size: int = 1, min_weight: int = 1):
-        self.edges: Dict[int, Dict[str, List[int]]] = {}
+    def __init__(self, edges_file: str, min_group_size: int = 1, min_weight: int = 1,
+                 index_file: Optional[str] = "artist_index.tsv"):
+        self.edges: Dict[int, Dict[str, array]] = {}
+        self.index: Optional[ArtistIndex] = ArtistIndex.load(index_file) if index_file else None
         self._load_edges(edges_file)
         self.years: Set[int]
         self.graph_i: List[Dict[str, int]] = []
@@ -30,7 +34,7 @@ class Network:
 
     def _add_edge(self, year: int, node1: int, node2: int):
         if year not in self.edges:
-            self.edges[year] = {"node1": [], "node2": []}
+            self.edges[year] = {"node1": array("l"), "node2": array("l")}
         self.edges[year]["node1"].append(node1)
         self.edges[year]["node2"].append(node2)
 
@@ -137,7 +141,10 @@ class Network:
                         temp_links.append((com_prev, com, ncommon))
 
             self._links.extend(temp_links)
-        self._nodes.extend([(k, ", ".join(map(str, v))) for k, v in self._c.items()])
+        if self.index is not None:
+            self._nodes.extend([(k, ", ".join(self.index.lookup_all(v))) for k, v in self._c.items()])
+        else:
+            self._nodes.extend([(k, ", ".join(map(str, v))) for k, v in self._c.items()])
 
     def _construct(self):
         self._reset()
@@ -1,18 +1,29 @@
+from argparse import ArgumentParser
 import cProfile
 from os import mkdir, path
 from pstats import SortKey, Stats
-from faster_tiles import TILES
+from artist_index import ArtistIndex
+from faster_tiles import CompactTILES, TILES
 
 
-def run_tiles(edges_path: str, output_dir: str = "output") -> None:
+def run_tiles(edges_path: str, output_dir: str = "output", compact: bool = False,
+              index_path: str = "artist_index.tsv") -> None:
     if not path.isdir(output_dir):
         mkdir(output_dir)
 
-    TILES(edges_path, path=output_dir, obs=365).execute()
+    n_nodes = len(ArtistIndex.load(index_path)) if path.isfile(index_path) else None
+    tiles = CompactTILES if compact else TILES
+    tiles(edges_path, path=output_dir, obs=365, n_nodes=n_nodes).execute()
 
 
 if __name__ == "__main__":
-    run_tiles("edges.tsv")
+    parser = ArgumentParser("run_tiles")
+    parser.add_argument("edges_path", type=str, nargs="?", default="edges.tsv", help="Path to the edge list TSV")
+    parser.add_argument("--compact", action="store_true", help="Use the memory-bounded CompactTILES")
+    parser.add_argument("--index", type=str, default="artist_index.tsv", help="Path to the artist index TSV")
+    args = parser.parse_args()
+
+    run_tiles(args.edges_path, compact=args.compact, index_path=args.index)
     # cProfile.run('run_tiles("edges.tsv")', 'prof')
     # p = Stats('prof')
     # p.sort_stats(SortKey.CUMULATIVE).print_stats(10)